@@ -4,32 +4,63 @@ This app defines the API endpoints for chatting with the agent, including a stre
 It also includes error handling to return user-friendly messages in case of issues with the AI service.
 """
 
-from fastapi import FastAPI, HTTPException, Header
+from fastapi import FastAPI, HTTPException, Header, Depends
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any, AsyncGenerator
+from typing import List, Optional, Dict, Any, AsyncGenerator, Tuple
+from contextlib import asynccontextmanager
 import os
-import json
-from datetime import datetime
+import sys
+import orjson
 from dotenv import load_dotenv
 from agent import workflow
+from utils.http import get_http_client, close_http_client
+from utils.memory import condense_history
 import uuid
 
 load_dotenv()
 
-def serialize_for_json(obj: Any) -> Any:
-    """Recursively serialize objects for JSON, converting datetime to ISO strings."""
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    elif isinstance(obj, dict):
-        return {key: serialize_for_json(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [serialize_for_json(item) for item in obj]
-    else:
-        return obj
+def sse_event(payload: Dict[str, Any]) -> str:
+    """Format a payload as a Server-Sent Events data line (orjson serializes datetimes as ISO strings)."""
+    return f"data: {orjson.dumps(payload).decode()}\n\n"
 
-app = FastAPI(title="Classroom Finder Agent")
+def is_classroom_artifact(artifact: Any) -> bool:
+    """Whether a ToolMessage artifact is a list of classroom dicts (dicts with a 'building' key)."""
+    return (
+        isinstance(artifact, list)
+        and len(artifact) > 0
+        and isinstance(artifact[0], dict)
+        and "building" in artifact[0]
+    )
+
+def extract_turn_results(messages: List[Any]) -> Tuple[bool, Optional[List[Dict[str, Any]]]]:
+    """
+    Find whether a tool was called and the latest classroom artifact in the agent's last turn.
+    Walks back from the newest message and stops at the last user message, so the cost
+    depends on the turn's length rather than the whole conversation.
+    When tools use response_format="content_and_artifact", the artifact is stored on the
+    ToolMessage (not the final AIMessage).
+    """
+    tool_called = False
+    classrooms = None
+    for msg in reversed(messages):
+        if getattr(msg, "type", None) == "human":
+            break
+        if getattr(msg, "tool_calls", None):
+            tool_called = True
+        if classrooms is None and is_classroom_artifact(getattr(msg, "artifact", None)):
+            classrooms = msg.artifact
+    return tool_called, classrooms
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared HTTP client used by the tools at startup and close it at shutdown."""
+    app.state.http = get_http_client()
+    yield
+    await close_http_client()
+
+app = FastAPI(title="Classroom Finder Agent", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -47,28 +78,34 @@ class Message(BaseModel):
 
 class ChatRequest(BaseModel):
     messages: List[Message]
+    # Conversation ID passed through as the LangGraph thread_id; a new one is generated when omitted
+    threadId: Optional[str] = None
 
 class ChatResponse(BaseModel):
     message: str
     classrooms: Optional[List[Dict[str, Any]]] = None
     toolCalled: bool = False
+    threadId: Optional[str] = None
+
+async def verify_authorization(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Require the Authorization header sent by the backend.
+    Runs as a dependency, which FastAPI resolves before validating the request body,
+    so unauthenticated requests are rejected before their messages are validated.
+    """
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Authorization header required")
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(
-    request: ChatRequest,
-    authorization: Optional[str] = Header(None)
-):
+@app.post("/chat", response_model=ChatResponse, dependencies=[Depends(verify_authorization)])
+async def chat_endpoint(request: ChatRequest):
     """
     Chat endpoint that processes messages using LangChain agent.
     Expected to be called by the backend with proper authorization.
     """
     try:
-        # Validate authorization header from backend
-        if not authorization:
-            raise HTTPException(status_code=401, detail="Authorization header required")
-        
-        # Generate unique thread ID for conversation
-        thread_id = str(uuid.uuid4())
+        # Pass the client's thread ID through (e.g. for tracing); no checkpointer is configured,
+        # so the full history still comes from the request. Generate one when none was supplied.
+        thread_id = request.threadId or str(uuid.uuid4())
         
         # Convert messages to LangChain format
         messages = [
@@ -76,6 +113,9 @@ async def chat_endpoint(
             for msg in request.messages
         ]
         
+        # Keep recent turns verbatim and summarize older ones to bound prompt size
+        messages = await condense_history(messages)
+        
         # Invoke agent workflow (async to support async tools)
         response = await workflow.ainvoke(
             {"messages": messages},
@@ -86,26 +126,14 @@ async def chat_endpoint(
         if response and "messages" in response:
             last_message = response["messages"][-1]
             
-            # Check if tool was called by inspecting message history
-            tool_called = any(
-                hasattr(msg, "tool_calls") and msg.tool_calls 
-                for msg in response["messages"]
-            )
-            
-            # Extract classroom data from ToolMessage artifacts
-            # When tools use response_format="content_and_artifact", the artifact
-            # is stored on the ToolMessage (not the final AIMessage).
-            classrooms = None
-            for msg in response["messages"]:
-                if hasattr(msg, "artifact") and isinstance(msg.artifact, list) and len(msg.artifact) > 0:
-                    # Only use classroom artifacts (dicts with 'id' and 'building' keys)
-                    if isinstance(msg.artifact[0], dict) and "building" in msg.artifact[0]:
-                        classrooms = msg.artifact
+            # Check for tool calls and classroom artifacts in this turn's messages only
+            tool_called, classrooms = extract_turn_results(response["messages"])
             
             return ChatResponse(
                 message=last_message.content,
                 classrooms=classrooms,
-                toolCalled=tool_called
+                toolCalled=tool_called,
+                threadId=thread_id
             )
         else:
             raise HTTPException(status_code=500, detail="No response from agent")
@@ -126,22 +154,16 @@ async def chat_endpoint(
         
         raise HTTPException(status_code=503, detail=user_friendly_error)
 
-@app.post("/chat/stream")
-async def chat_stream_endpoint(
-    request: ChatRequest,
-    authorization: Optional[str] = Header(None)
-):
+@app.post("/chat/stream", dependencies=[Depends(verify_authorization)])
+async def chat_stream_endpoint(request: ChatRequest):
     """
     Streaming chat endpoint that processes messages using LangChain agent.
     Returns Server-Sent Events (SSE) format.
     """
     try:
-        # Validate authorization header from backend
-        if not authorization:
-            raise HTTPException(status_code=401, detail="Authorization header required")
-        
-        # Generate unique thread ID for conversation
-        thread_id = str(uuid.uuid4())
+        # Pass the client's thread ID through (e.g. for tracing); no checkpointer is configured,
+        # so the full history still comes from the request. Generate one when none was supplied.
+        thread_id = request.threadId or str(uuid.uuid4())
         
         # Convert messages to LangChain format
         messages = [
@@ -152,38 +174,47 @@ async def chat_stream_endpoint(
         async def generate_stream() -> AsyncGenerator[str, None]:
             """Generator function that yields SSE-formatted chunks"""
             try:
-                import asyncio
                 classrooms = None
                 
-                # Get the agent's response (single invocation)
-                response = await workflow.ainvoke(
-                    {"messages": messages},
-                    config={"configurable": {"thread_id": thread_id}}
-                )
+                # Keep recent turns verbatim and summarize older ones to bound prompt size
+                history = await condense_history(messages)
+                
+                # Whether the current model call has streamed any text yet
+                message_streamed = False
                 
-                if response and "messages" in response:
-                    last_message = response["messages"][-1]
-                    
-                    # Extract classroom artifacts
-                    for msg in response["messages"]:
-                        if hasattr(msg, "artifact") and isinstance(msg.artifact, list) and len(msg.artifact) > 0:
-                            if isinstance(msg.artifact[0], dict) and "building" in msg.artifact[0]:
-                                classrooms = msg.artifact
-                    
-                    # Stream the response text in chunks for better UX
-                    if hasattr(last_message, "content") and last_message.content:
-                        full_text = str(last_message.content)
-                        # Stream in word-sized chunks
-                        words = full_text.split(' ')
-                        for i, word in enumerate(words):
-                            chunk = word + (' ' if i < len(words) - 1 else '')
-                            yield f"data: {json.dumps({'text': chunk})}\n\n"
-                            # Small delay to make streaming visible
-                            await asyncio.sleep(0.02)
+                # Stream the agent run as it happens: model tokens are forwarded as soon as
+                # they are generated, and tool results are inspected for classroom artifacts
+                async for event in workflow.astream_events(
+                    {"messages": history},
+                    config={"configurable": {"thread_id": thread_id}},
+                    version="v2"
+                ):
+                    kind = event["event"]
+                    if kind == "on_chat_model_stream":
+                        content = event["data"]["chunk"].content
+                        # Tool-call chunks carry no text; skip them
+                        if isinstance(content, str) and content:
+                            message_streamed = True
+                            yield sse_event({'text': content})
+                    elif kind == "on_chat_model_end":
+                        output = event["data"].get("output")
+                        content = getattr(output, "content", None)
+                        if getattr(output, "tool_calls", None):
+                            # Text sent alongside tool calls is not part of the final answer
+                            # (/chat only returns the last message), so tell the client to discard it
+                            if message_streamed:
+                                yield sse_event({'reset': True})
+                        elif not message_streamed and isinstance(content, str) and content:
+                            # The model did not stream tokens; send the whole answer at once
+                            yield sse_event({'text': content})
+                        message_streamed = False
+                    elif kind == "on_tool_end":
+                        artifact = getattr(event["data"].get("output"), "artifact", None)
+                        if is_classroom_artifact(artifact):
+                            classrooms = artifact
                 
-                # Send completion signal with classrooms (serialize datetime objects)
-                serialized_classrooms = serialize_for_json(classrooms) if classrooms else None
-                yield f"data: {json.dumps({'done': True, 'classrooms': serialized_classrooms})}\n\n"
+                # Send completion signal with classrooms
+                yield sse_event({'done': True, 'classrooms': classrooms or None, 'threadId': thread_id})
                 
             except Exception as e:
                 print(f"Error in stream generation: {e}")
@@ -199,8 +230,7 @@ async def chat_stream_endpoint(
                 else:
                     user_friendly_error = "An error occurred while processing your request. Please try again."
                 
-                error_msg = json.dumps({"error": user_friendly_error, "done": True})
-                yield f"data: {error_msg}\n\n"
+                yield sse_event({"error": user_friendly_error, "done": True})
         
         return StreamingResponse(
             generate_stream(),
@@ -223,4 +253,10 @@ async def health_check():
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", "8000"))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Each worker is a separate process with its own lifespan, so each gets its own
+    # HTTP connection pool and in-memory caches
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # uvloop (libuv event loop) is not available on Windows; fall back to asyncio there
+    loop = "asyncio" if sys.platform == "win32" else "uvloop"
+    # An import string is required for uvicorn to spawn multiple workers
+    uvicorn.run("app:app", host="0.0.0.0", port=port, workers=workers, loop=loop, http="httptools")
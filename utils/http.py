@@ -0,0 +1,43 @@
+"""
+Shared HTTP client utilities for the classroom finder agent.
+A single pooled httpx.AsyncClient is reused by every tool so outbound calls
+(e.g. Google Maps) keep their TCP/TLS connections alive between requests.
+"""
+
+import httpx
+from typing import Optional
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Create a new pooled AsyncClient with the agent's default limits and timeout.
+    HTTP/2 lets concurrent requests to the same host (e.g. chunked Distance Matrix calls)
+    share one multiplexed connection.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+        timeout=10.0,
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared AsyncClient.
+    The FastAPI lifespan opens it at startup; other entry points (CLI, LangGraph Studio)
+    get one created lazily on first use.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = create_http_client()
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared AsyncClient, if one is open."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
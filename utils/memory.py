@@ -0,0 +1,81 @@
+"""
+Conversation memory utilities for the classroom finder agent.
+Keeps the history sent to the agent bounded: recent messages are passed through as-is
+and older turns are condensed into a single summary message.
+"""
+
+import os
+from typing import List, Dict, Optional, Tuple
+from cachetools import LRUCache
+from .model import model
+
+# Number of most recent messages always passed to the agent verbatim.
+# Older messages are summarized in blocks of this size, so the summarized prefix (and its
+# cached summary) only changes every MAX_RECENT_MESSAGES messages instead of every turn.
+# Clamped to at least 1 so the latest message is always kept and the block size is never zero.
+MAX_RECENT_MESSAGES = max(1, int(os.getenv("MAX_RECENT_MESSAGES", "12")))
+
+SUMMARY_PROMPT = """Summarize the earlier part of a conversation between a Dartmouth instructor and the ITC Classroom Assistant.
+You are given the summary so far (if any) and the messages that followed it; return one updated summary covering both.
+Keep only what is needed to continue helping: class style, class size, required amenities, buildings or locations mentioned, classrooms already shown, and any open questions.
+Reply with a few short bullet points and nothing else."""
+
+# Keyed by (previous summary, block of messages), so each summary is built once per block
+_summary_cache: LRUCache = LRUCache(maxsize=256)
+
+
+async def _summarize(previous: Optional[str], block: Tuple[Tuple[str, str], ...]) -> str:
+    """
+    Fold one block of (role, content) pairs into the previous summary with the chat model.
+    The model input is bounded by one summary plus MAX_RECENT_MESSAGES messages.
+    """
+    key = (previous, block)
+    summary = _summary_cache.get(key)
+    if summary is None:
+        transcript = "\n".join(f"{role}: {content}" for role, content in block)
+        if previous is not None:
+            transcript = f"Summary so far:\n{previous}\n\nMessages since then:\n{transcript}"
+        response = await model.ainvoke([
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": transcript},
+        ])
+        summary = str(response.content)
+        _summary_cache[key] = summary
+    return summary
+
+
+async def condense_history(messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Bound the message history passed to the agent.
+    System messages are kept. Once enough older messages have accumulated, they are replaced
+    by one system message summarizing them, followed by the most recent messages verbatim.
+    The summary is built incrementally, one MAX_RECENT_MESSAGES block at a time.
+    If summarization fails, the full history is returned unchanged.
+
+    Args:
+        messages: Messages in LangChain dict format ({"role": ..., "content": ...})
+
+    Returns:
+        The (possibly condensed) list of messages
+    """
+    system_messages = [msg for msg in messages if msg["role"] == "system"]
+    conversation = [msg for msg in messages if msg["role"] != "system"]
+
+    # Round the cut down to a whole block so the summarized prefix stays stable between turns
+    cut = (len(conversation) - MAX_RECENT_MESSAGES) // MAX_RECENT_MESSAGES * MAX_RECENT_MESSAGES
+    if cut <= 0:
+        return messages
+
+    try:
+        # Summarize block by block; earlier blocks are cache hits, so a turn normally makes
+        # at most one model call, covering only the block that just left the window
+        summary = None
+        for start in range(0, cut, MAX_RECENT_MESSAGES):
+            block = conversation[start:start + MAX_RECENT_MESSAGES]
+            summary = await _summarize(summary, tuple((msg["role"], msg["content"]) for msg in block))
+    except Exception as e:
+        print(f"Error summarizing conversation history: {e}")
+        return messages
+
+    summary_message = {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}
+    return system_messages + [summary_message] + conversation[cut:]
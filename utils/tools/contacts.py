@@ -3,19 +3,151 @@ Contact information tool definition and helper functions for the Classroom Finde
 This module defines a set of tools (and helpers) that can be used by the agent to route users to the appropriate Dartmouth office based on their questions.
 """
 
+import os
+import re
+import contextlib
+import heapq
+import pickle
 import yaml
-from typing import List, Dict, Any
+import ahocorasick
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
 from pathlib import Path
 from langchain_core.tools import tool
 
-# Load contacts configuration
+# Prefer the LibYAML-backed loader; fall back to the pure-Python one if PyYAML was built without it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def _is_word_char(char: str) -> bool:
+    """Whether a character counts as a word character for regex word boundaries (\\w)."""
+    return char.isalnum() or char == '_'
+
+
+def _build_keyword_matchers(contact_keywords: List[List[str]]) -> Tuple[ahocorasick.Automaton, Dict[str, List[Tuple[int, int]]]]:
+    """
+    Build the keyword matchers used by find_relevant_contacts.
+    Each lowercased keyword maps to the (contact index, keyword position) pairs that list it.
+    
+    Args:
+        contact_keywords: Lowercased keyword lists, one per contact
+        
+    Returns:
+        Tuple of (Aho-Corasick automaton for keywords longer than 2 characters,
+        dict of whole-word keywords of 2 characters or fewer)
+    """
+    long_keywords: Dict[str, List[Tuple[int, int]]] = {}
+    short_keywords: Dict[str, List[Tuple[int, int]]] = {}
+    for idx, keywords in enumerate(contact_keywords):
+        for pos, keyword_lower in enumerate(keywords):
+            matchers = short_keywords if len(keyword_lower) <= 2 else long_keywords
+            matchers.setdefault(keyword_lower, []).append((idx, pos))
+    
+    automaton = ahocorasick.Automaton()
+    for keyword_lower, owners in long_keywords.items():
+        automaton.add_word(keyword_lower, (keyword_lower, owners))
+    automaton.make_automaton()
+    return automaton, short_keywords
+
+
 config_path = Path(__file__).parent / "contacts_config.yaml"
-with open(config_path, 'r') as f:
-    CONTACTS_CONFIG = yaml.safe_load(f)
+
+# The processed config (contacts, lowercased keywords, keyword matchers) is pickled next to
+# the YAML and reused on later starts until the YAML changes.
+# Bump _CONTACTS_CACHE_VERSION whenever the cached structure changes.
+cache_path = config_path.with_suffix(".pkl")
+_CONTACTS_CACHE_VERSION = 1
+
+
+def _build_contacts_index(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Precompute everything find_relevant_contacts needs from the parsed config.
+    
+    Args:
+        config: The parsed contacts configuration
+        
+    Returns:
+        Dictionary with the config, lowercased keyword lists and keyword matchers
+    """
+    # Lowercased keywords per contact; index i belongs to contacts[i]
+    contact_keywords = [
+        [keyword.lower() for keyword in contact.get('keywords', [])]
+        for contact in config.get('contacts', [])
+    ]
+    automaton, short_keywords = _build_keyword_matchers(contact_keywords)
+    return {
+        'config': config,
+        'contact_keywords': contact_keywords,
+        'automaton': automaton,
+        'short_keywords': short_keywords,
+    }
+
+
+def _load_contacts_index() -> Dict[str, Any]:
+    """
+    Load the processed contacts config, from the pickle cache when it matches the YAML.
+    Otherwise parse the YAML, rebuild the index and try to refresh the cache.
+    
+    Returns:
+        Dictionary with the config, lowercased keyword lists and keyword matchers
+    """
+    stat = config_path.stat()
+    signature = (stat.st_mtime_ns, stat.st_size, _CONTACTS_CACHE_VERSION)
+    
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+        if cached.get('signature') == signature:
+            return cached
+    except Exception:
+        # Missing, stale or unreadable cache: rebuild below
+        pass
+    
+    with open(config_path, 'r') as f:
+        index = _build_contacts_index(yaml.load(f, Loader=SafeLoader))
+    index['signature'] = signature
+    
+    # Write atomically so concurrent workers never read a partial file;
+    # a read-only filesystem just means the index is rebuilt on every start
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(index, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Cleanup can fail for the same reason the write did (e.g. EROFS)
+        with contextlib.suppress(OSError):
+            tmp_path.unlink(missing_ok=True)
+    
+    return index
+
+
+# Load contacts configuration
+_CONTACTS_INDEX = _load_contacts_index()
+CONTACTS_CONFIG = _CONTACTS_INDEX['config']
 
 CONTACTS = CONTACTS_CONFIG.get('contacts', [])
 ROUTING_RULES = CONTACTS_CONFIG.get('routing_rules', [])
 
+# Lowercased keywords per contact, computed once; index i belongs to CONTACTS[i]
+CONTACT_KEYWORDS: List[List[str]] = _CONTACTS_INDEX['contact_keywords']
+KEYWORD_AUTOMATON = _CONTACTS_INDEX['automaton']
+SHORT_KEYWORDS = _CONTACTS_INDEX['short_keywords']
+
+
+@lru_cache(maxsize=1024)
+def _normalize(query: str) -> str:
+    """
+    Lowercase a query and collapse its whitespace.
+    Shared by contact matching, routing and the response cache so a query is normalized once.
+    """
+    return " ".join(query.lower().split())
+
 
 def find_relevant_contacts(query: str, max_contacts: int = 2) -> List[Dict[str, Any]]:
     """
@@ -28,42 +160,63 @@ def find_relevant_contacts(query: str, max_contacts: int = 2) -> List[Dict[str,
     Returns:
         List of contact dictionaries with match scores
     """
-    import re
-    query_lower = query.lower()
-    contact_scores = []
+    return _match_contacts(_normalize(query), max_contacts)
+
+
+def _match_contacts(query_lower: str, max_contacts: int) -> List[Dict[str, Any]]:
+    """
+    Score contacts against an already-normalized query and return the top matches.
     
-    for contact in CONTACTS:
-        score = 0
-        matched_keywords = []
-        
-        # Check keyword matches with word boundaries to avoid partial matches
-        for keyword in contact.get('keywords', []):
-            keyword_lower = keyword.lower()
-            # Use word boundaries for multi-word keywords or single words
-            # e.g. this prevents "av" from matching "available"
-            if len(keyword_lower) <= 2:
-                # For very short keywords, require exact word match
-                pattern = r'\b' + re.escape(keyword_lower) + r'\b'
-            else:
-                # For longer keywords, allow partial matches within words (typo tolerance)
-                pattern = r'\b' + re.escape(keyword_lower)
-            
-            if re.search(pattern, query_lower):
-                score += 1
-                matched_keywords.append(keyword)
+    Args:
+        query_lower: The query as returned by _normalize
+        max_contacts: Maximum number of contacts to return
         
-        if score > 0:
-            contact_scores.append({
-                'contact': contact,
-                'score': score,
-                'matched_keywords': matched_keywords
-            })
+    Returns:
+        List of contact dictionaries with match scores
+    """
+    # Each distinct keyword counts once, in the order it first appears in the query
+    matched: Dict[str, List[Tuple[int, int]]] = {}
+    
+    # Longer keywords must start at a word boundary but may end mid-word (typo tolerance),
+    # e.g. "book" matches "booking". A single automaton pass finds all of them.
+    if KEYWORD_AUTOMATON.kind == ahocorasick.AHOCORASICK:
+        for end, (keyword_lower, owners) in KEYWORD_AUTOMATON.iter(query_lower):
+            start = end - len(keyword_lower) + 1
+            preceded_by_word = start > 0 and _is_word_char(query_lower[start - 1])
+            if preceded_by_word != _is_word_char(keyword_lower[0]):
+                matched.setdefault(keyword_lower, owners)
+    
+    # Very short keywords require an exact word match
+    # e.g. this prevents "av" from matching "available"
+    for word in _WORD_RE.findall(query_lower):
+        if word in SHORT_KEYWORDS:
+            matched.setdefault(word, SHORT_KEYWORDS[word])
     
-    # Sort by score (descending)
-    contact_scores.sort(key=lambda x: x['score'], reverse=True)
+    # Score by contact index; keyword strings are only looked up for contacts that matched
+    scores = [0] * len(CONTACTS)
+    matched_positions: Dict[int, List[int]] = {}
+    for owners in matched.values():
+        for idx, pos in owners:
+            scores[idx] += 1
+            matched_positions.setdefault(idx, []).append(pos)
+    
+    # Partial top-k by score (descending); ties keep config order, like a stable sort
+    top_indices = heapq.nlargest(
+        max_contacts,
+        (idx for idx, score in enumerate(scores) if score),
+        key=scores.__getitem__
+    )
     
     # Return top matches
-    return contact_scores[:max_contacts]
+    return [
+        {
+            'contact': CONTACTS[idx],
+            'score': scores[idx],
+            # Report matched keywords in config order
+            'matched_keywords': [CONTACTS[idx]['keywords'][pos] for pos in sorted(matched_positions[idx])]
+        }
+        for idx in top_indices
+    ]
 
 
 def format_contact_info(contact: Dict[str, Any], include_description: bool = True) -> str:
@@ -105,6 +258,7 @@ def get_contact_information_helper(query: str) -> str:
     """
     Main function to get contact information based on user query.
     This is the helper function called by the LangChain tool.
+    Queries are normalized with _normalize so repeats hit the cache.
     
     Args:
         query: The user's question or request
@@ -112,7 +266,23 @@ def get_contact_information_helper(query: str) -> str:
     Returns:
         Formatted string with relevant contact information
     """
-    matches = find_relevant_contacts(query, max_contacts=2)
+    return _get_contact_information_cached(_normalize(query))
+
+
+# The result depends only on the query and CONTACTS, which is loaded once at import.
+# Call _get_contact_information_cached.cache_clear() if the contacts config is ever reloaded.
+@lru_cache(maxsize=1024)
+def _get_contact_information_cached(norm_query: str) -> str:
+    """
+    Build the contact information response for an already-normalized query.
+    
+    Args:
+        norm_query: The user query as returned by _normalize
+        
+    Returns:
+        Formatted string with relevant contact information
+    """
+    matches = _match_contacts(norm_query, max_contacts=2)
     
     if not matches:
         # No matches found - provide general guidance
@@ -197,30 +367,33 @@ def should_route_to_contact(query: str) -> bool:
     Returns:
         True if the query should be routed to a contact
     """
-    query_lower = query.lower()
-    
-    # Patterns that suggest routing needed
-    routing_patterns = [
-        # Booking & Scheduling
-        'book', 'reserve', 'schedule', 'available', 'availability',
-        'can i get', 'request',
-        
-        # Administrative
-        'timetable', 'deadline', 'add course', 'change time',
-        'exam', 'final',
-        
-        # Accessibility & Special Needs
-        'accessibility', 'disability', 'accommodation',
-        
-        # Furniture & Modifications
-        'furniture', 'deliver', 'add chair', 'add table', 'podium',
-        
-        # Technology Issues
-        'not working', 'broken', 'fix', 'setup', 'training',
-        'how to use zoom', 'how to set up',
-        
-        # Questions beyond agent scope
-        'who do i contact', 'where do i', 'how do i',
-    ]
-    
-    return any(pattern in query_lower for pattern in routing_patterns)
+    return _ROUTE_RE.search(_normalize(query)) is not None
+
+
+# Patterns that suggest routing needed
+ROUTING_PATTERNS = [
+    # Booking & Scheduling
+    'book', 'reserve', 'schedule', 'available', 'availability',
+    'can i get', 'request',
+
+    # Administrative
+    'timetable', 'deadline', 'add course', 'change time',
+    'exam', 'final',
+
+    # Accessibility & Special Needs
+    'accessibility', 'disability', 'accommodation',
+
+    # Furniture & Modifications
+    'furniture', 'deliver', 'add chair', 'add table', 'podium',
+
+    # Technology Issues
+    'not working', 'broken', 'fix', 'setup', 'training',
+    'how to use zoom', 'how to set up',
+
+    # Questions beyond agent scope
+    'who do i contact', 'where do i', 'how do i',
+]
+
+# All routing patterns unioned into one regex, compiled once at import.
+# Matched against _normalize(query), which is already lowercased.
+_ROUTE_RE = re.compile("|".join(re.escape(pattern) for pattern in ROUTING_PATTERNS))
@@ -4,13 +4,101 @@ Uses Google Maps API for distance matrix calculations.
 """
 
 from langchain_core.tools import tool
-from typing import List, Dict, Any
-import httpx
+from typing import List, Dict, Any, Optional, Tuple
+from cachetools import TTLCache
+import asyncio
 import os
+from ..http import get_http_client
 
 GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
 DEFAULT_CAMPUS = "Dartmouth College, Hanover, NH"
 
+# Google Maps API endpoints
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+
+# Campus addresses and routes rarely change, so Maps results are kept for a day.
+# Only successful lookups are cached; errors are always retried on the next call.
+# Cache operations never await, so they are atomic on the event loop and need no lock.
+MAPS_CACHE_TTL_SECONDS = 86400
+_geocode_cache: TTLCache = TTLCache(maxsize=2048, ttl=MAPS_CACHE_TTL_SECONDS)
+_distance_cache: TTLCache = TTLCache(maxsize=2048, ttl=MAPS_CACHE_TTL_SECONDS)
+
+# Distance Matrix accepts at most 25 destinations per request; larger batches are split
+# into chunks fetched concurrently, with a cap on in-flight requests to respect Maps QPS.
+MAX_DESTINATIONS_PER_REQUEST = 25
+_maps_semaphore = asyncio.Semaphore(5)
+
+
+def _cache_key(*parts: str) -> Tuple[str, ...]:
+    """Normalize lookup parts (case and whitespace) so equivalent queries share a cache entry."""
+    return tuple(" ".join(part.lower().split()) for part in parts)
+
+
+async def _fetch_distance_chunk(
+    origin: str,
+    destinations: List[str],
+    mode: str,
+    timeout: float
+) -> List[Dict[str, Any]]:
+    """Fetch Distance Matrix elements for a single request's worth of destinations."""
+    async with _maps_semaphore:
+        resp = await get_http_client().get(
+            DISTANCE_MATRIX_URL,
+            params={
+                "origins": origin,
+                "destinations": "|".join(destinations),
+                "mode": mode,
+                "key": GOOGLE_MAPS_API_KEY
+            },
+            timeout=timeout
+        )
+    return resp.json()["rows"][0]["elements"]
+
+
+async def _get_distance_elements(
+    origin: str,
+    destinations: List[str],
+    mode: str,
+    timeout: float = 10.0
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Get Distance Matrix elements from origin to each destination, aligned with `destinations`.
+    Cached (origin, destination, mode) pairs are served locally; only the remaining unique
+    destinations are sent to the API, in chunks of MAX_DESTINATIONS_PER_REQUEST.
+    Missing elements are returned as None.
+    """
+    keys = [_cache_key(origin, destination, mode) for destination in destinations]
+    elements = [_distance_cache.get(key) for key in keys]
+
+    # Unique destinations still to fetch, keyed by their normalized cache key
+    pending: Dict[Tuple[str, ...], str] = {}
+    for key, destination, elem in zip(keys, destinations, elements):
+        if elem is None:
+            pending.setdefault(key, destination)
+
+    if pending:
+        # The API caps destinations per request, so fetch in chunks concurrently
+        pending_keys = list(pending)
+        chunks = [
+            pending_keys[i:i + MAX_DESTINATIONS_PER_REQUEST]
+            for i in range(0, len(pending_keys), MAX_DESTINATIONS_PER_REQUEST)
+        ]
+        chunk_elements = await asyncio.gather(*(
+            _fetch_distance_chunk(origin, [pending[key] for key in chunk], mode, timeout)
+            for chunk in chunks
+        ))
+        fetched = {
+            key: elem
+            for chunk, elements_for_chunk in zip(chunks, chunk_elements)
+            for key, elem in zip(chunk, elements_for_chunk)
+        }
+        for key, elem in fetched.items():
+            if elem["status"] == "OK":
+                _distance_cache[key] = elem
+        elements = [elem if elem is not None else fetched.get(key) for key, elem in zip(keys, elements)]
+
+    return elements
 
 
 @tool
@@ -31,22 +119,26 @@ async def validate_address(address: str) -> Dict[str, Any]:
         return {"valid": False, "error": "Google Maps API key not configured"}
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://maps.googleapis.com/maps/api/geocode/json",
-                params={"address": address, "key": GOOGLE_MAPS_API_KEY},
-                timeout=10.0
+        key = _cache_key(address)
+        result = _geocode_cache.get(key)
+        
+        if result is None:
+            response = await get_http_client().get(
+                GEOCODE_URL,
+                params={"address": address, "key": GOOGLE_MAPS_API_KEY}
             )
             data = response.json()
+            
+            if data["status"] != "OK" or not data.get("results"):
+                return {
+                    "valid": False,
+                    "input": address,
+                    "error": "Address not found. Please check spelling or add more details."
+                }
+            
+            result = data["results"][0]
+            _geocode_cache[key] = result
         
-        if data["status"] != "OK" or not data.get("results"):
-            return {
-                "valid": False,
-                "input": address,
-                "error": "Address not found. Please check spelling or add more details."
-            }
-        
-        result = data["results"][0]
         return {
             "valid": True,
             "input": address,
@@ -73,14 +165,9 @@ async def get_distance(origin: str, destination: str, mode: str = "walking") ->
         return "Error: Google Maps API key not configured"
     
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                "https://maps.googleapis.com/maps/api/distancematrix/json",
-                params={"origins": origin, "destinations": destination, "mode": mode, "key": GOOGLE_MAPS_API_KEY}
-            )
-            elem = resp.json()["rows"][0]["elements"][0]
+        elem = (await _get_distance_elements(origin, [destination], mode))[0]
         
-        if elem["status"] != "OK":
+        if not elem or elem["status"] != "OK":
             return f"Could not find route between locations."
         
         return f"{elem['distance']['text']} ({elem['duration']['text']} {mode})"
@@ -112,23 +199,12 @@ async def sort_classrooms_by_distance(
         # Build addresses from building names
         destinations = [f"{c.get('building', 'Unknown')}, {DEFAULT_CAMPUS}" for c in classrooms]
         
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                "https://maps.googleapis.com/maps/api/distancematrix/json",
-                params={
-                    "origins": origin,
-                    "destinations": "|".join(destinations),
-                    "mode": mode,
-                    "key": GOOGLE_MAPS_API_KEY
-                },
-                timeout=15.0
-            )
-            elements = resp.json()["rows"][0]["elements"]
+        elements = await _get_distance_elements(origin, destinations, mode, timeout=15.0)
         
         # Pair classrooms with distances, filter failures
         results = [
             {**c, "dist": e["distance"]["value"], "dist_text": e["distance"]["text"], "time": e["duration"]["text"]}
-            for c, e in zip(classrooms, elements) if e["status"] == "OK"
+            for c, e in zip(classrooms, elements) if e and e["status"] == "OK"
         ]
         results.sort(key=lambda x: x["dist"])
         
@@ -4,9 +4,62 @@ Handles basic and advanced classroom queries with various filters and amenities.
 """
 
 from langchain_core.tools import tool
-from typing import Optional, Tuple, Any, List
+from typing import Optional, Tuple, Any, List, Dict
 from ..db import get_db_connection
 
+# SQL conditions for the class style flags, in (seminar, lecture, group learning) order
+_STYLE_CONDITIONS = (
+    '"seminarSetup" = %s',
+    '"lectureSetup" = %s',
+    '"groupLearning" = %s',
+)
+
+# Amenity filters as (tool argument, SQL condition).
+# String filters apply when a non-empty value is given.
+_STRING_AMENITY_FILTERS = (
+    ("projection_surface", '"projectionSurface" = %s'),
+    ("computer", '"computer" = %s'),
+    ("microphone", '"microphone" = %s'),
+    ("zoom_room", '"zoomRoom" = %s'),
+    ("teaching_station", '"teachingStation" = %s'),
+    ("floor_type", '"floorType" = %s'),
+    ("furniture", '"furniture" = %s'),
+)
+# Boolean filters apply whenever they are set, so False filters for rooms without the amenity.
+_BOOL_AMENITY_FILTERS = (
+    ("classroom_capture", '"classroomCapture" = %s'),
+    ("group_learning_screens", '"groupLearningScreens" = %s'),
+    ("white_board", '"whiteBoard" = %s'),
+    ("chalk_board", '"chalkBoard" = %s'),
+    ("dual_board_screen_use", '"dualBoardScreenUse" = %s'),
+    ("group_learning_boards", '"groupLearningBoards" = %s'),
+    ("windows", '"windows" = %s'),
+    ("ac", '"ac" = %s'),
+    ("film_screening", '"filmScreening" = %s'),
+)
+
+
+def _style_conditions(seminar_setup: bool, lecture_setup: bool, group_learning: bool) -> Tuple[List[str], List[Any]]:
+    """Build SQL conditions and params for the requested class styles."""
+    flags = (seminar_setup, lecture_setup, group_learning)
+    conditions = [condition for condition, flag in zip(_STYLE_CONDITIONS, flags) if flag]
+    return conditions, [True] * len(conditions)
+
+
+def _amenity_conditions(args: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+    """Build SQL conditions and params for the amenity filters set in a tool's arguments."""
+    conditions = []
+    params = []
+    for arg, condition in _STRING_AMENITY_FILTERS:
+        if args[arg]:
+            conditions.append(condition)
+            params.append(args[arg])
+    for arg, condition in _BOOL_AMENITY_FILTERS:
+        if args[arg] is not None:
+            conditions.append(condition)
+            params.append(args[arg])
+    return conditions, params
+
 
 def _rows_to_dicts(classrooms) -> List[dict]:
     """Convert RealDictRow objects to plain dicts."""
@@ -101,18 +154,7 @@ def query_classrooms_basic(
     """
     try:
         # Build SQL query
-        conditions = []
-        params = []
-        
-        if seminar_setup:
-            conditions.append('"seminarSetup" = %s')
-            params.append(True)
-        if lecture_setup:
-            conditions.append('"lectureSetup" = %s')
-            params.append(True)
-        if group_learning:
-            conditions.append('"groupLearning" = %s')
-            params.append(True)
+        conditions, params = _style_conditions(seminar_setup, lecture_setup, group_learning)
         if class_size:
             # Any room that fits at least class_size students works — no upper bound
             conditions.append('"seatCount" >= %s')
@@ -153,17 +195,7 @@ def query_classrooms_basic(
 
         # If still no results, retry with only the style filter (drop size)
         if not classrooms and (seminar_setup or lecture_setup or group_learning):
-            style_conditions = []
-            style_params = []
-            if seminar_setup:
-                style_conditions.append('"seminarSetup" = %s')
-                style_params.append(True)
-            if lecture_setup:
-                style_conditions.append('"lectureSetup" = %s')
-                style_params.append(True)
-            if group_learning:
-                style_conditions.append('"groupLearning" = %s')
-                style_params.append(True)
+            style_conditions, style_params = _style_conditions(seminar_setup, lecture_setup, group_learning)
             fallback_query = 'SELECT * FROM "Classroom" WHERE ' + ' AND '.join(style_conditions) + ' ORDER BY "seatCount" ASC LIMIT 9'
             with get_db_connection() as conn:
                 with conn.cursor() as cur:
@@ -254,77 +286,21 @@ def query_classrooms_with_amenities(
     Returns:
         A tuple of (summary text, list of classroom dicts)
     """
+    # Snapshot of the tool arguments, read by the table-driven amenity filters
+    args = locals()
     try:
         # Build SQL query
-        conditions = []
-        params = []
-        
         # Essential criteria
-        if seminar_setup:
-            conditions.append('"seminarSetup" = %s')
-            params.append(True)
-        if lecture_setup:
-            conditions.append('"lectureSetup" = %s')
-            params.append(True)
-        if group_learning:
-            conditions.append('"groupLearning" = %s')
-            params.append(True)
+        conditions, params = _style_conditions(seminar_setup, lecture_setup, group_learning)
         if class_size:
             # Any room that fits at least class_size students works — no upper bound
             conditions.append('"seatCount" >= %s')
             params.append(class_size)
         
-        # Amenities - string fields
-        if projection_surface:
-            conditions.append('"projectionSurface" = %s')
-            params.append(projection_surface)
-        if computer:
-            conditions.append('"computer" = %s')
-            params.append(computer)
-        if microphone:
-            conditions.append('"microphone" = %s')
-            params.append(microphone)
-        if zoom_room:
-            conditions.append('"zoomRoom" = %s')
-            params.append(zoom_room)
-        if teaching_station:
-            conditions.append('"teachingStation" = %s')
-            params.append(teaching_station)
-        if floor_type:
-            conditions.append('"floorType" = %s')
-            params.append(floor_type)
-        if furniture:
-            conditions.append('"furniture" = %s')
-            params.append(furniture)
-            
-        # Amenities - boolean fields
-        if classroom_capture is not None:
-            conditions.append('"classroomCapture" = %s')
-            params.append(classroom_capture)
-        if group_learning_screens is not None:
-            conditions.append('"groupLearningScreens" = %s')
-            params.append(group_learning_screens)
-        if white_board is not None:
-            conditions.append('"whiteBoard" = %s')
-            params.append(white_board)
-        if chalk_board is not None:
-            conditions.append('"chalkBoard" = %s')
-            params.append(chalk_board)
-        if dual_board_screen_use is not None:
-            conditions.append('"dualBoardScreenUse" = %s')
-            params.append(dual_board_screen_use)
-        if group_learning_boards is not None:
-            conditions.append('"groupLearningBoards" = %s')
-            params.append(group_learning_boards)
-        if windows is not None:
-            conditions.append('"windows" = %s')
-            params.append(windows)
-        if ac is not None:
-            conditions.append('"ac" = %s')
-            params.append(ac)
-        if film_screening is not None:
-            conditions.append('"filmScreening" = %s')
-            params.append(film_screening)
+        # Amenities
+        amenity_conditions, amenity_params = _amenity_conditions(args)
+        conditions += amenity_conditions
+        params += amenity_params
         
         query = 'SELECT * FROM "Classroom"'
         if conditions:
@@ -340,17 +316,7 @@ def query_classrooms_with_amenities(
         # If no results, progressively relax constraints and retry
         if not classrooms:
             # Drop amenity filters but keep style + size
-            relaxed_conditions = []
-            relaxed_params = []
-            if seminar_setup:
-                relaxed_conditions.append('"seminarSetup" = %s')
-                relaxed_params.append(True)
-            if lecture_setup:
-                relaxed_conditions.append('"lectureSetup" = %s')
-                relaxed_params.append(True)
-            if group_learning:
-                relaxed_conditions.append('"groupLearning" = %s')
-                relaxed_params.append(True)
+            relaxed_conditions, relaxed_params = _style_conditions(seminar_setup, lecture_setup, group_learning)
             if class_size:
                 relaxed_conditions.append('"seatCount" >= %s')
                 relaxed_params.append(class_size)